@@ -29,6 +29,8 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 from google.cloud import storage
 import requests  # Para autenticación vía REST API
+from escritor_adaptativo import EscritorAdaptativo
+from sesiones import Sesion, listar_sesiones
 # --- CONFIGURACIÓN GLOBAL ---
 #  Configuración del proyecto
 # --- FIREBASE ---
@@ -50,6 +52,8 @@ FILE_SENT = 'datos_enviados.json'
 FILE_UNSENT = 'datos_no_enviados.json'
 FILE_ACCEL_OUTPUT = 'salida_acelerada.json'
 FILE_USERS = 'usuarios.json'
+SESION_EN_CURSO = 'EN CURSO'
+MAX_FILAS_MONITOR = 2000  # filas leídas de una sesión histórica por cada vista del monitor
 
 PUNTOS_ID = [f"N{i}" for i in range(1, 13)]
 MESES = {1: "enero", 2: "febrero", 3: "marzo", 4: "abril", 5: "mayo", 6: "junio",
@@ -80,6 +84,7 @@ class SimulationEngine:
     def __init__(self, log_callback):
         self.log = log_callback
         self.db = self.init_firestore()
+        self.escritor = EscritorAdaptativo(self.db, COLECCION_FIRESTORE, self.log, FILE_UNSENT) if self.db else None
         self.storage_client = self.init_storage()
         self.running = False
         self.config = {}
@@ -138,18 +143,17 @@ class SimulationEngine:
             return False
 
     def enviar_datos(self, data_batch):
-        if not self.db: return False
-        try:
-            batch = self.db.batch()
-            for item in data_batch:
-                doc_ref = self.db.collection(COLECCION_FIRESTORE).document()
-                batch.set(doc_ref, item)
-            batch.commit()
-            self.log(f"⚡ Enviado lote de {len(data_batch)} registros.")
-            return True
-        except Exception as e:
-            self.log(f"❌ FALLO CONEXIÓN: {e}")
-            return False
+        # El escritor adaptativo agrupa lecturas de varios ticks y hace los commits en segundo plano
+        if not self.escritor: return False
+        if not self.escritor.agregar(data_batch): return False
+        stats = self.escritor.estadisticas()
+        self.log(f"⚡ Encolados {len(data_batch)} registros (enviados: {stats['enviados']}, "
+                 f"pendientes: {stats['pendientes']}, lote: {stats['tam_lote']}, concurrencia: {stats['concurrencia']}).")
+        return True
+
+    def cerrar_escritor(self, timeout=10):
+        if self.escritor:
+            self.escritor.cerrar(timeout)
 
 # --- INTERFAZ DE LOGIN (AJUSTADA PARA FIREBASE) ---
 class LoginWindow:
@@ -230,6 +234,8 @@ class SimulatorApp:
         self.intervalo_minutos = tk.IntVar(value=1)
         self.horas_aceleradas = tk.IntVar(value=1)
         self.sort_descending = True  # Por defecto descendente
+        self.sesion_abierta = None   # Sesión histórica cargada en el monitor (None = sesión en curso)
+        self.apertura = 0            # Cuenta las aperturas pedidas; sólo la última se muestra
         self.setup_ui()
         
         # Capturar el evento de cierre de la ventana (X de la barra superior)
@@ -351,6 +357,24 @@ class SimulatorApp:
         combo_filter = ttk.Combobox(filter_frame, textvariable=self.filter_var, values=["TODOS"] + PUNTOS_ID, state="readonly", width=15)
         combo_filter.pack(side="right", padx=5)
         ttk.Label(filter_frame, text="Filtrar vista:").pack(side="right", padx=5)
+        self.combo_filter = combo_filter
+
+        # --- Navegador de Sesiones Pasadas ---
+        session_frame = ttk.Frame(self.tab_main)
+        session_frame.pack(fill="x", padx=10, pady=5, side="bottom")
+
+        ttk.Label(session_frame, text="Sesión:").pack(side="left", padx=5)
+        self.session_var = tk.StringVar(value=SESION_EN_CURSO)
+        self.combo_session = ttk.Combobox(session_frame, textvariable=self.session_var, state="readonly", width=40,
+                                          postcommand=self.refresh_sessions)
+        self.combo_session.pack(side="left", padx=5)
+        ttk.Button(session_frame, text="📂 ABRIR SESIÓN", command=self.open_session).pack(side="left", padx=5)
+
+        ttk.Button(session_frame, text="APLICAR", command=self.apply_filter).pack(side="right", padx=5)
+        self.bloque_var = tk.StringVar(value="TODAS")
+        self.combo_bloque = ttk.Combobox(session_frame, textvariable=self.bloque_var, values=["TODAS"], state="readonly", width=15)
+        self.combo_bloque.pack(side="right", padx=5)
+        ttk.Label(session_frame, text="Hora:").pack(side="right", padx=5)
 
         # Botones de ordenamiento (Movidos al fondo)
         sort_frame = ttk.Frame(filter_frame)
@@ -370,7 +394,16 @@ class SimulatorApp:
                 try:
                     self.engine.guardar_en_archivo([])
                 except: pass
-            self.root.destroy()
+            if self.sesion_abierta:
+                self.sesion_abierta.cerrar()
+            # Vaciar los lotes pendientes hacia Firestore fuera del hilo de la interfaz
+            self.root.withdraw()
+
+            def worker():
+                self.engine.cerrar_escritor()
+                self.root.after(0, self.root.destroy)
+
+            threading.Thread(target=worker, daemon=True).start()
 
     def validate_ranges(self):
         errores = []
@@ -534,11 +567,67 @@ class SimulatorApp:
         for index, (val, k) in enumerate(l):
             self.monitor_tree.move(k, '', index)
 
+    def refresh_sessions(self):
+        # El archivo que el motor está escribiendo no se ofrece: guardar_en_archivo lo reescribe
+        en_uso = os.path.abspath(self.engine.session_file) if self.engine.session_file else None
+        sesiones = [r for r in listar_sesiones() if os.path.abspath(r) != en_uso]
+        self.combo_session.config(values=[SESION_EN_CURSO] + sesiones)
+
+    def open_session(self):
+        ruta = self.session_var.get()
+        self.apertura += 1
+        apertura = self.apertura
+        if ruta == SESION_EN_CURSO:
+            self.set_session_view(None, apertura)
+            return
+
+        self.log_message(f"📂 Abriendo sesión {ruta} ...")
+
+        # La primera apertura construye el índice sidecar; se hace fuera del hilo de la interfaz
+        def worker():
+            try:
+                sesion = Sesion(ruta)
+            except Exception as e:
+                self.log_message(f"❌ ERROR SESIÓN: {e}")
+                return
+            self.root.after(0, self.set_session_view, sesion, apertura)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def set_session_view(self, sesion, apertura):
+        # Una apertura que llega tarde (doble clic, o se eligió otra sesión) se descarta
+        if apertura != self.apertura:
+            if sesion:
+                sesion.cerrar()
+            return
+        if self.sesion_abierta:
+            self.sesion_abierta.cerrar()
+        self.sesion_abierta = sesion
+        puntos = sesion.puntos() if sesion else PUNTOS_ID
+        self.combo_filter.config(values=["TODOS"] + puntos)
+        self.combo_bloque.config(values=["TODAS"] + (sesion.bloques() if sesion else []))
+        self.filter_var.set("TODOS")
+        self.bloque_var.set("TODAS")
+        if sesion:
+            self.log_message(f"📂 Sesión {sesion.nombre}: {sesion.total()} lecturas, {len(puntos)} puntos.")
+        self.apply_filter()
+
     def apply_filter(self):
         filtro = self.filter_var.get()
         for item in self.monitor_tree.get_children():
             self.monitor_tree.delete(item)
-        
+
+        if self.sesion_abierta:
+            # Sesión histórica: el índice resuelve el filtro y sólo se leen esas lecturas del archivo
+            id_punto = None if filtro == "TODOS" else filtro
+            bloque = None if self.bloque_var.get() == "TODAS" else self.bloque_var.get()
+            for entry in self.sesion_abierta.leer(id_punto, bloque, ultimos=MAX_FILAS_MONITOR):
+                self.monitor_tree.insert("", "end", values=(entry["id_punto"], entry["consumo_kwh"], entry["fecha"]))
+            total = self.sesion_abierta.total(id_punto, bloque)
+            self.log_message(f"Vista filtrada por: {filtro} / {self.bloque_var.get()} "
+                             f"({min(total, MAX_FILAS_MONITOR)} de {total} lecturas)")
+            return
+
         # Recargar desde la data de sesión filtrando
         for entry in self.engine.session_data:
             if filtro == "TODOS" or entry["id_punto"] == filtro:
@@ -546,6 +635,8 @@ class SimulatorApp:
         self.log_message(f"Vista filtrada por: {filtro}")
 
     def update_table(self, batch):
+        # Mientras se revisa una sesión histórica no se mezclan las lecturas en vivo
+        if self.sesion_abierta: return
         filtro = self.filter_var.get()
         for item in batch:
             if filtro == "TODOS" or item["id_punto"] == filtro:
@@ -0,0 +1,70 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from escritor_adaptativo import LIMITE_LOTE
+
+
+class ResourceExhausted(Exception):
+    """Mismo nombre que la excepción de google.api_core que usa Firestore al saturarse."""
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+
+    def set(self, doc_id, item):
+        self.ops.append((doc_id, item))
+
+    def commit(self):
+        self.db.commit(self.ops)
+
+
+class FakeCollection:
+    def document(self, doc_id=None):
+        return doc_id or uuid.uuid4().hex
+
+
+class FakeDB:
+    """Cliente Firestore local: inyecta latencia y errores de throttling según `falla(n_commit)`."""
+
+    def __init__(self, latencia=0.005, falla=lambda n: False):
+        self.latencia = latencia
+        self.falla = falla
+        self.lock = threading.Lock()
+        self.docs = {}
+        self.tamanos = []
+        self.escrituras = 0
+        self.n_commits = 0
+        self.escritor = None
+        self.muestras = []      # (tam_lote, concurrencia) del escritor al iniciar cada commit
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def collection(self, nombre):
+        return FakeCollection()
+
+    def commit(self, ops):
+        with self.lock:
+            n = self.n_commits
+            self.n_commits += 1
+            self.tamanos.append(len(ops))
+            if self.escritor:
+                self.muestras.append((self.escritor.tam_lote, self.escritor.concurrencia))
+        assert len(ops) <= LIMITE_LOTE
+        time.sleep(self.latencia)
+        if self.falla(n):
+            raise ResourceExhausted("quota exceeded")
+        with self.lock:
+            self.escrituras += len(ops)
+            self.docs.update(ops)
+
+
+@pytest.fixture
+def fake_db():
+    """Fábrica del cliente Firestore falso compartido por los tests: fake_db(latencia=..., falla=...)."""
+    return FakeDB
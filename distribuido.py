@@ -0,0 +1,612 @@
+# *********************************************************************************************
+# Para proyecto NUBE VERDE                                                                    *
+# Descripción: Modo distribuido del simulador. Un COORDINADOR reparte rangos de puntos de     *
+# medición, la semilla y el reloj compartido entre varios TRABAJADORES conectados por TCP.    *
+# Cada trabajador genera y escribe sus lecturas de forma independiente y reporta latidos      *
+# con su rendimiento; si un trabajador deja de latir, sus puntos se reparten entre los vivos, *
+# y si entra uno nuevo a mitad de la simulación, los más cargados le ceden puntos.            *
+#                                                                                             *
+# Entrega "al menos una vez": un punto heredado se retoma desde el último tick confirmado,    *
+# así que los ticks escritos después de ese latido se escriben otra vez. En Firestore el ID   *
+# del documento es "<semilla>-<punto>-<tick>" y la repetición sobrescribe; en ARCHIVO pueden  *
+# quedar lecturas repetidas (idénticas) entre los archivos de los trabajadores.               *
+#                                                                                             *
+# Uso (localhost):                                                                            *
+#   python distribuido.py coordinador --puerto 5050 --semilla 42 --inicio 2026-02-01T00:00:00 *
+#   python distribuido.py trabajador --puerto 5050 --nombre T1 --destino ARCHIVO              *
+# *********************************************************************************************
+import json
+import os
+import random
+import socket
+import textwrap
+import threading
+import time
+import argparse
+
+from datetime import datetime, timedelta
+
+# --- CONFIGURACIÓN DEL MODO DISTRIBUIDO ---
+PUERTO_DEFECTO = 5050
+INTERVALO_LATIDO = 2.0      # segundos entre latidos de cada trabajador
+TIMEOUT_LATIDO = 10.0       # segundos sin latido para dar por muerto a un trabajador
+TAM_BUFFER_ARCHIVO = 500    # lecturas acumuladas antes de escribir un bloque al archivo
+
+
+# --- PROTOCOLO (JSON por línea sobre TCP) ---
+def enviar_mensaje(sock, mensaje):
+    data = (json.dumps(mensaje, ensure_ascii=False) + "\n").encode("utf-8")
+    sock.sendall(data)
+
+
+def leer_mensajes(sock):
+    """Generador de mensajes recibidos; termina cuando se cierra la conexión."""
+    with sock.makefile("r", encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.strip()
+            if linea:
+                yield json.loads(linea)
+
+
+def cerrar_conexion(sock):
+    """shutdown() antes de close(): con un makefile() abierto, close() solo no corta la conexión."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    sock.close()
+
+
+def repartir_puntos(puntos, n):
+    """Divide la lista de puntos en n rangos contiguos lo más parejos posible."""
+    base, extra = divmod(len(puntos), n)
+    rangos, inicio = [], 0
+    for i in range(n):
+        fin = inicio + base + (1 if i < extra else 0)
+        rangos.append(puntos[inicio:fin])
+        inicio = fin
+    return rangos
+
+
+def id_documento(semilla, pid, tick):
+    return f"{semilla}-{pid}-{tick}"
+
+
+def generar_lectura(engine, semilla, pid, tick, inicio, intervalo, v_min, v_max):
+    """
+    Lectura determinista: el valor depende sólo de (semilla, punto, tick), así que no importa
+    qué trabajador la genere ni en qué orden.
+    """
+    rng = random.Random(f"{semilla}:{pid}:{tick}")
+    fecha = inicio + timedelta(minutes=intervalo * tick)
+    return {
+        "id_punto": pid,
+        "consumo_kwh": round(rng.uniform(v_min, v_max), 2),
+        "fecha": engine.get_formatted_date(fecha),
+        "timestamp": fecha.isoformat()
+    }
+
+
+# --- SALIDA A ARCHIVO ---
+class ArchivoSesion:
+    """
+    Escribe la sesión como arreglo JSON (mismo formato que guardar_en_archivo) agregando bloques
+    al final, sin reescribir lo ya guardado. Misma interfaz agregar() que EscritorAdaptativo.
+    El archivo se crea en modo exclusivo: si la ruta ya existe lanza FileExistsError en vez de truncarla.
+    """
+    def __init__(self, ruta, tam_buffer=TAM_BUFFER_ARCHIVO):
+        self.ruta = ruta
+        self.tam_buffer = tam_buffer
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.avisos = []
+        self.vacio = True
+        self.f = open(ruta, 'x', encoding='utf-8')
+        self.f.write("[")
+
+    def agregar(self, lecturas, ids=None, al_confirmar=None):
+        with self.lock:
+            if self.f.closed:
+                return False
+            self.buffer.extend(lecturas)
+            if al_confirmar:
+                self.avisos.append(al_confirmar)
+            avisos = self._escribir() if len(self.buffer) >= self.tam_buffer else []
+        for aviso in avisos:
+            aviso(True)
+        return True
+
+    def vaciar(self):
+        with self.lock:
+            avisos = self._escribir() if not self.f.closed else []
+        for aviso in avisos:
+            aviso(True)
+
+    def cerrar(self):
+        self.vaciar()
+        with self.lock:
+            if not self.f.closed:
+                self.f.write("\n]")
+                self.f.close()
+
+    def _escribir(self):
+        if self.buffer:
+            texto = ",\n".join(textwrap.indent(json.dumps(item, indent=4, ensure_ascii=False), "    ")
+                               for item in self.buffer)
+            self.f.write(("\n" if self.vacio else ",\n") + texto)
+            self.f.flush()
+            self.vacio = False
+            self.buffer = []
+        avisos, self.avisos = self.avisos, []
+        return avisos
+
+
+# --- COORDINADOR ---
+class Coordinador:
+    def __init__(self, host="127.0.0.1", puerto=PUERTO_DEFECTO, semilla=None, puntos=None,
+                 intervalo_minutos=1, ticks=60, rangos=None, min_trabajadores=1,
+                 acelerado=True, inicio=None, timeout_latido=TIMEOUT_LATIDO, log_callback=print):
+        if puntos is None:
+            from Simulador import PUNTOS_ID
+            puntos = PUNTOS_ID
+        self.log = log_callback
+        self.host = host
+        self.puerto = puerto
+        self.semilla = semilla if semilla is not None else random.randrange(2 ** 31)
+        self.puntos = list(puntos)
+        self.intervalo = intervalo_minutos
+        self.ticks = ticks
+        self.rangos = rangos or {pid: (10, 100) for pid in self.puntos}
+        self.min_trabajadores = min_trabajadores
+        self.acelerado = acelerado
+        self.timeout_latido = timeout_latido
+
+        self.reloj = inicio         # fecha del tick 0; fijarla junto a la semilla hace la salida reproducible
+        self.inicio = None
+        self.lock = threading.Lock()
+        self.trabajadores = {}      # nombre -> {"sock", "puntos": {pid: tick_desde}, "ultimo_latido", ...}
+        self.completados = set()
+        self.puntos_pendientes = {}  # puntos huérfanos cuando no queda ningún trabajador vivo
+        self.en_traspaso = {}       # pid -> trabajador nuevo que lo recibe cuando el actual lo libere
+        self.terminado = threading.Event()
+        self.sock = None
+
+    def iniciar(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.puerto))
+        self.sock.listen()
+        self.puerto = self.sock.getsockname()[1]
+        self.log(f"🛰 Coordinador escuchando en {self.host}:{self.puerto} (semilla {self.semilla})")
+        threading.Thread(target=self.aceptar_conexiones, daemon=True).start()
+        threading.Thread(target=self.vigilar_latidos, daemon=True).start()
+
+    def esperar(self, timeout=None):
+        return self.terminado.wait(timeout)
+
+    def detener(self):
+        self.terminado.set()
+        with self.lock:
+            for info in self.trabajadores.values():
+                try:
+                    enviar_mensaje(info["sock"], {"tipo": "detener"})
+                except OSError:
+                    pass
+                cerrar_conexion(info["sock"])
+            self.trabajadores.clear()
+        if self.sock:
+            self.sock.close()
+
+    def rendimiento_total(self):
+        with self.lock:
+            return sum(info["por_segundo"] for info in self.trabajadores.values())
+
+    def aceptar_conexiones(self):
+        while not self.terminado.is_set():
+            try:
+                conn, addr = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.atender_trabajador, args=(conn, addr), daemon=True).start()
+
+    def atender_trabajador(self, conn, addr):
+        nombre = None
+        try:
+            for msg in leer_mensajes(conn):
+                if msg["tipo"] == "registro":
+                    nombre = msg["nombre"]
+                    self.registrar(nombre, conn)
+                elif msg["tipo"] == "latido" and nombre:
+                    self.recibir_latido(nombre, conn, msg)
+                elif msg["tipo"] == "liberados" and nombre:
+                    self.recibir_liberados(nombre, conn, msg["puntos"])
+        except (OSError, ValueError) as e:
+            self.log(f"❌ Conexión con {nombre or addr} perdida: {e}")
+        if nombre:
+            self.dar_de_baja(nombre, conn)
+
+    def registrar(self, nombre, conn):
+        with self.lock:
+            # Un trabajador que se reconecta con el mismo nombre reemplaza a su conexión anterior
+            anterior = self.trabajadores.pop(nombre, None)
+            huerfanos = self.soltar(anterior) if anterior else {}
+            self.trabajadores[nombre] = {
+                "sock": conn, "puntos": {}, "ultimo_latido": time.monotonic(),
+                "enviados": 0, "por_segundo": 0.0
+            }
+            self.log(f"🤝 Trabajador {nombre} registrado ({len(self.trabajadores)} conectados)")
+            if self.inicio is None:
+                if len(self.trabajadores) >= self.min_trabajadores:
+                    self.asignar_inicial()
+                return
+            self.enviar_configuracion(nombre)
+            huerfanos.update(self.puntos_pendientes)
+            self.puntos_pendientes = {}
+            if huerfanos:
+                self.rebalancear(huerfanos)
+            else:
+                self.ceder_a(nombre)
+
+    def enviar_configuracion(self, nombre):
+        enviar_mensaje(self.trabajadores[nombre]["sock"], {
+            "tipo": "configuracion",
+            "semilla": self.semilla,
+            "inicio": self.inicio.isoformat(),
+            "intervalo": self.intervalo,
+            "ticks": self.ticks,
+            "acelerado": self.acelerado,
+            "rangos": self.rangos
+        })
+
+    def asignar_inicial(self):
+        # Reloj compartido: todos los trabajadores calculan la fecha de cada tick desde aquí
+        self.inicio = self.reloj or datetime.now().replace(microsecond=0)
+        self.log(f"⏱ Tick 0 = {self.inicio.isoformat()} (reproducir con --semilla {self.semilla} "
+                 f"--inicio {self.inicio.isoformat()})")
+        nombres = sorted(self.trabajadores)
+        for nombre, rango in zip(nombres, repartir_puntos(self.puntos, len(nombres))):
+            self.enviar_configuracion(nombre)
+            self.asignar(nombre, {pid: 0 for pid in rango})
+
+    def asignar(self, nombre, puntos):
+        info = self.trabajadores[nombre]
+        info["puntos"].update(puntos)
+        enviar_mensaje(info["sock"], {"tipo": "asignar", "puntos": puntos})
+        if puntos:
+            self.log(f"📦 {nombre} ← {', '.join(puntos)}")
+
+    def activos(self, nombre):
+        """Puntos del trabajador que aún tienen ticks por generar y no están ya en traspaso."""
+        return [pid for pid in self.trabajadores[nombre]["puntos"]
+                if pid not in self.completados and pid not in self.en_traspaso]
+
+    def ceder_a(self, nuevo):
+        """Pide a los trabajadores más cargados que liberen puntos para el recién llegado."""
+        total = sum(len(self.activos(n)) for n in self.trabajadores)
+        objetivo = total // len(self.trabajadores)
+        faltan = objetivo
+        for nombre in sorted(self.trabajadores, key=lambda n: -len(self.activos(n))):
+            if nombre == nuevo or faltan <= 0:
+                continue
+            activos = sorted(self.activos(nombre), key=self.puntos.index)
+            cedidos = activos[objetivo:][:faltan]
+            if not cedidos:
+                continue
+            for pid in cedidos:
+                self.en_traspaso[pid] = nuevo
+            faltan -= len(cedidos)
+            enviar_mensaje(self.trabajadores[nombre]["sock"], {"tipo": "liberar", "puntos": cedidos})
+            self.log(f"🔀 {nombre} cede {', '.join(cedidos)} a {nuevo}")
+
+    def recibir_liberados(self, nombre, conn, puntos):
+        with self.lock:
+            info = self.trabajadores.get(nombre)
+            if not info or info["sock"] is not conn:
+                return
+            por_destino, huerfanos = {}, {}
+            for pid, tick in puntos.items():
+                info["puntos"].pop(pid, None)
+                destino = self.en_traspaso.pop(pid, None)
+                if self.ticks is not None and tick >= self.ticks:
+                    self.completados.add(pid)
+                elif destino in self.trabajadores:
+                    por_destino.setdefault(destino, {})[pid] = tick
+                else:
+                    huerfanos[pid] = tick
+            for destino, asignados in por_destino.items():
+                self.asignar(destino, asignados)
+            if huerfanos:
+                self.rebalancear(huerfanos)
+
+    def recibir_latido(self, nombre, conn, msg):
+        with self.lock:
+            info = self.trabajadores.get(nombre)
+            if not info or info["sock"] is not conn:
+                return
+            info["ultimo_latido"] = time.monotonic()
+            info["enviados"] = msg["enviados"]
+            info["por_segundo"] = msg["por_segundo"]
+            # El progreso reportado es el tick desde el que hay que retomar si el trabajador muere
+            for pid, siguiente in msg["progreso"].items():
+                if pid in info["puntos"]:
+                    info["puntos"][pid] = siguiente
+                    if self.ticks is not None and siguiente >= self.ticks:
+                        self.completados.add(pid)
+            listo = self.ticks is not None and len(self.completados) == len(self.puntos)
+        if listo and not self.terminado.is_set():
+            self.log(f"✅ Simulación distribuida completada (semilla {self.semilla})")
+            self.detener()
+
+    def vigilar_latidos(self):
+        while not self.terminado.wait(self.timeout_latido / 4):
+            ahora = time.monotonic()
+            with self.lock:
+                muertos = [(n, info["sock"]) for n, info in self.trabajadores.items()
+                           if ahora - info["ultimo_latido"] > self.timeout_latido]
+            for nombre, conn in muertos:
+                self.log(f"💀 {nombre} sin latido por más de {self.timeout_latido}s")
+                self.dar_de_baja(nombre, conn)
+
+    def soltar(self, info):
+        """Cierra la conexión de un trabajador y devuelve sus puntos sin terminar."""
+        cerrar_conexion(info["sock"])
+        for pid in info["puntos"]:
+            self.en_traspaso.pop(pid, None)
+        return {pid: t for pid, t in info["puntos"].items() if pid not in self.completados}
+
+    def dar_de_baja(self, nombre, conn):
+        with self.lock:
+            info = self.trabajadores.get(nombre)
+            # Si el nombre ya pertenece a una conexión nueva, la baja de la vieja no la toca
+            if info is None or info["sock"] is not conn or self.terminado.is_set():
+                return
+            del self.trabajadores[nombre]
+            huerfanos = self.soltar(info)
+            if not huerfanos:
+                return
+            if not self.trabajadores:
+                self.log(f"⚠️ Sin trabajadores vivos; {len(huerfanos)} puntos en espera")
+                self.puntos_pendientes.update(huerfanos)
+                return
+            self.rebalancear(huerfanos)
+
+    def rebalancear(self, huerfanos):
+        # Se reparten los puntos huérfanos empezando por el trabajador con menos carga
+        vivos = sorted(self.trabajadores, key=lambda n: (len(self.activos(n)), n))
+        orden = sorted(huerfanos, key=self.puntos.index)
+        for nombre, rango in zip(vivos, repartir_puntos(orden, len(vivos))):
+            if rango:
+                self.asignar(nombre, {pid: huerfanos[pid] for pid in rango})
+
+
+# --- TRABAJADOR ---
+class Trabajador:
+    def __init__(self, host="127.0.0.1", puerto=PUERTO_DEFECTO, nombre=None, destino="ARCHIVO",
+                 engine=None, directorio='.', intervalo_latido=INTERVALO_LATIDO, log_callback=print):
+        if engine is None:
+            from Simulador import SimulationEngine
+            engine = SimulationEngine(log_callback)
+        self.log = log_callback
+        self.host = host
+        self.puerto = puerto
+        self.nombre = nombre or f"{socket.gethostname()}-{random.randrange(10000)}"
+        self.destino = destino
+        self.engine = engine
+        self.directorio = directorio
+        self.intervalo_latido = intervalo_latido
+
+        self.config = None
+        self.salida = None          # ArchivoSesion o el EscritorAdaptativo del engine
+        self.siguiente = {}         # pid -> siguiente tick por generar
+        self.progreso = {}          # pid -> primer tick aún no confirmado por la salida
+        self.confirmados = {}       # pid -> ticks confirmados fuera de orden (commits concurrentes)
+        self.lock = threading.Lock()
+        self.lock_envio = threading.Lock()
+        self.hay_trabajo = threading.Event()
+        self.stop_event = threading.Event()
+        self.enviados = 0
+        self.t_inicio = None
+        self.sock = None
+
+    def ejecutar(self):
+        if self.destino == "DB" and self.engine.escritor is None:
+            # Sin Firestore no se registra: así el coordinador no le asigna puntos que nunca escribiría
+            self.log(f"❌ {self.nombre}: destino DB sin conexión a Firestore, no se registra")
+            return
+        self.sock = socket.create_connection((self.host, self.puerto))
+        self.enviar({"tipo": "registro", "nombre": self.nombre})
+        self.log(f"🔌 {self.nombre} conectado a {self.host}:{self.puerto}")
+        threading.Thread(target=self.escuchar, daemon=True).start()
+        threading.Thread(target=self.latir, daemon=True).start()
+        self.generar()
+        if isinstance(self.salida, ArchivoSesion):
+            self.salida.cerrar()
+        else:
+            # Vaciar los lotes que el escritor adaptativo aún tenga pendientes hacia Firestore
+            self.engine.cerrar_escritor()
+
+    def enviar(self, mensaje):
+        with self.lock_envio:
+            enviar_mensaje(self.sock, mensaje)
+
+    def detener(self):
+        self.stop_event.set()
+        self.hay_trabajo.set()
+        if self.sock:
+            cerrar_conexion(self.sock)
+
+    def vaciar_salida(self):
+        if isinstance(self.salida, ArchivoSesion):
+            self.salida.vaciar()
+
+    def escuchar(self):
+        try:
+            for msg in leer_mensajes(self.sock):
+                if msg["tipo"] == "configuracion":
+                    msg["inicio"] = datetime.fromisoformat(msg["inicio"])
+                    self.config = msg
+                    if self.destino == "DB":
+                        self.salida = self.engine.escritor
+                    elif self.salida is None:
+                        self.salida = self.abrir_archivo(msg["semilla"])
+                elif msg["tipo"] == "asignar":
+                    with self.lock:
+                        self.siguiente.update(msg["puntos"])
+                        self.progreso.update(msg["puntos"])
+                        for pid in msg["puntos"]:
+                            self.confirmados[pid] = set()
+                    self.hay_trabajo.set()
+                elif msg["tipo"] == "liberar":
+                    self.liberar(msg["puntos"])
+                elif msg["tipo"] == "detener":
+                    break
+        except (OSError, ValueError):
+            pass
+        self.detener()
+
+    def abrir_archivo(self, semilla):
+        """
+        Un archivo nuevo por conexión: si el trabajador se reinicia con el mismo nombre en el mismo
+        directorio, lo ya confirmado al coordinador queda intacto y se sigue en *_2.json, *_3.json, ...
+        """
+        base = os.path.join(self.directorio, f"simulacion_{semilla}_{self.nombre}")
+        n = 1
+        while True:
+            try:
+                return ArchivoSesion(f"{base}.json" if n == 1 else f"{base}_{n}.json")
+            except FileExistsError:
+                n += 1
+
+    def liberar(self, pids):
+        """Deja de generar los puntos pedidos y devuelve desde qué tick debe seguir el nuevo dueño."""
+        with self.lock:
+            for pid in pids:
+                self.siguiente.pop(pid, None)
+        self.vaciar_salida()
+        with self.lock:
+            liberados = {pid: self.progreso.pop(pid) for pid in pids if pid in self.progreso}
+            for pid in liberados:
+                self.confirmados.pop(pid, None)
+        try:
+            self.enviar({"tipo": "liberados", "puntos": liberados})
+        except OSError:
+            pass
+
+    def latir(self):
+        while not self.stop_event.wait(self.intervalo_latido):
+            # El archivo se vacía antes de reportar, así el progreso cubre lo que ya está en disco
+            self.vaciar_salida()
+            with self.lock:
+                progreso = dict(self.progreso)
+            transcurrido = time.monotonic() - self.t_inicio if self.t_inicio else 0
+            try:
+                self.enviar({
+                    "tipo": "latido",
+                    "enviados": self.enviados,
+                    "por_segundo": round(self.enviados / transcurrido, 2) if transcurrido else 0.0,
+                    "progreso": progreso
+                })
+            except OSError:
+                return
+
+    def siguiente_lote(self):
+        """Puntos con el tick más atrasado; así los puntos heredados alcanzan a los propios."""
+        with self.lock:
+            limite = self.config["ticks"]
+            pendientes = {pid: t for pid, t in self.siguiente.items() if limite is None or t < limite}
+            if not pendientes:
+                return None, []
+            tick = min(pendientes.values())
+            return tick, [pid for pid, t in pendientes.items() if t == tick]
+
+    def generar(self):
+        while not self.stop_event.is_set():
+            tick, pids = self.siguiente_lote() if self.config else (None, [])
+            if not pids:
+                # Reporta el progreso final y espera nuevas asignaciones del coordinador
+                self.vaciar_salida()
+                self.hay_trabajo.clear()
+                self.hay_trabajo.wait(self.intervalo_latido)
+                continue
+            cfg = self.config
+            if self.t_inicio is None:
+                self.t_inicio = time.monotonic()
+            if not cfg["acelerado"]:
+                # Tiempo real: el tick se escribe cuando el reloj compartido lo alcanza
+                espera = (cfg["inicio"] + timedelta(minutes=cfg["intervalo"] * tick) - datetime.now()).total_seconds()
+                if espera > 0 and self.stop_event.wait(espera):
+                    break
+
+            batch = [generar_lectura(self.engine, cfg["semilla"], pid, tick, cfg["inicio"], cfg["intervalo"],
+                                     *cfg["rangos"].get(pid, (10, 100)))
+                     for pid in pids]
+            # IDs deterministas: si el tick se repite tras un rebalanceo, Firestore lo sobrescribe
+            ids = [id_documento(cfg["semilla"], pid, tick) for pid in pids]
+            # El progreso sólo avanza cuando la salida confirma el tick (commit o bloque en disco)
+            ok = self.salida is not None and self.salida.agregar(
+                batch, ids, al_confirmar=lambda exito, pids=pids, tick=tick: self.confirmar(pids, tick, exito))
+            if not ok:
+                # Se reintenta el mismo tick en la siguiente vuelta
+                self.stop_event.wait(1)
+                continue
+
+            with self.lock:
+                for pid in pids:
+                    if pid in self.siguiente:
+                        self.siguiente[pid] = tick + 1
+            self.enviados += len(batch)
+
+    def confirmar(self, pids, tick, ok):
+        with self.lock:
+            for pid in pids:
+                if pid not in self.progreso:
+                    continue
+                if not ok:
+                    # Lote descartado por la salida: se vuelve a generar desde ese tick
+                    if pid in self.siguiente:
+                        self.siguiente[pid] = min(self.siguiente[pid], tick)
+                    continue
+                self.confirmados[pid].add(tick)
+                while self.progreso[pid] in self.confirmados[pid]:
+                    self.confirmados[pid].discard(self.progreso[pid])
+                    self.progreso[pid] += 1
+        if not ok:
+            self.hay_trabajo.set()
+
+
+# --- ARRANQUE ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador Nube Verde en modo distribuido")
+    sub = parser.add_subparsers(dest="modo", required=True)
+
+    p_coord = sub.add_parser("coordinador")
+    p_coord.add_argument("--host", default="127.0.0.1")
+    p_coord.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    p_coord.add_argument("--semilla", type=int, default=None)
+    p_coord.add_argument("--inicio", type=datetime.fromisoformat, default=None,
+                         help="Fecha ISO del tick 0; con la misma semilla reproduce la misma salida")
+    p_coord.add_argument("--trabajadores", type=int, default=1, help="Trabajadores a esperar antes de iniciar")
+    p_coord.add_argument("--horas", type=int, default=1)
+    p_coord.add_argument("--intervalo", type=int, default=1, help="Minutos entre lecturas")
+    p_coord.add_argument("--tiempo-real", action="store_true", help="Respetar el reloj en vez de generar en ráfaga")
+
+    p_trab = sub.add_parser("trabajador")
+    p_trab.add_argument("--host", default="127.0.0.1")
+    p_trab.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    p_trab.add_argument("--nombre", default=None)
+    p_trab.add_argument("--destino", choices=["ARCHIVO", "DB"], default="ARCHIVO")
+
+    args = parser.parse_args()
+    if args.modo == "coordinador":
+        coord = Coordinador(args.host, args.puerto, args.semilla, intervalo_minutos=args.intervalo,
+                            ticks=max(1, args.horas * 60 // args.intervalo),
+                            min_trabajadores=args.trabajadores, acelerado=not args.tiempo_real,
+                            inicio=args.inicio)
+        coord.iniciar()
+        try:
+            while not coord.esperar(5):
+                coord.log(f"📈 Rendimiento agregado: {coord.rendimiento_total():.1f} lecturas/s")
+        except KeyboardInterrupt:
+            coord.detener()
+    else:
+        Trabajador(args.host, args.puerto, args.nombre, args.destino).ejecutar()
@@ -0,0 +1,251 @@
+# *********************************************************************************************
+# Para proyecto NUBE VERDE                                                                    *
+# Descripción: Escritor adaptativo para Firestore. Acumula lecturas de varios ticks en lotes, *
+# respeta el límite de 500 escrituras por WriteBatch, mantiene varios commits en vuelo y      *
+# ajusta tamaño de lote y concurrencia estilo AIMD (subida aditiva, bajada multiplicativa)    *
+# según la latencia observada y los errores de throttling/contención.                         *
+# *********************************************************************************************
+import json
+import os
+import textwrap
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# --- LÍMITES Y PARÁMETROS AIMD ---
+LIMITE_LOTE = 500               # máximo de escrituras por WriteBatch en Firestore
+LOTE_INICIAL = 50
+CONCURRENCIA_INICIAL = 2
+CONCURRENCIA_MAX = 16
+ESPERA_MAX = 1.0                # segundos máximos que una lectura espera a completar lote
+LATENCIA_OBJETIVO = 0.5         # segundos por commit antes de considerarlo lento
+PASO_LOTE = 25                  # subida aditiva del tamaño de lote por commit rápido
+MAX_REINTENTOS = 5
+PAUSA_BASE = 0.1                # backoff inicial tras throttling (se duplica en fallos seguidos)
+PAUSA_MAX = 10.0
+
+# Errores de google.api_core que indican saturación o contención (se reintentan siempre)
+ERRORES_THROTTLING = {"ResourceExhausted", "TooManyRequests", "Aborted", "ServiceUnavailable",
+                      "DeadlineExceeded", "Conflict"}
+
+
+def es_throttling(error):
+    return type(error).__name__ in ERRORES_THROTTLING
+
+
+class EscritorAdaptativo:
+    def __init__(self, db, coleccion, log_callback=print, archivo_no_enviados=None,
+                 lote_inicial=LOTE_INICIAL, concurrencia_inicial=CONCURRENCIA_INICIAL,
+                 concurrencia_max=CONCURRENCIA_MAX, espera_max=ESPERA_MAX,
+                 latencia_objetivo=LATENCIA_OBJETIVO):
+        self.db = db
+        self.coleccion = coleccion
+        self.log = log_callback
+        self.archivo_no_enviados = archivo_no_enviados
+        self.tam_lote = min(lote_inicial, LIMITE_LOTE)
+        self.concurrencia = concurrencia_inicial
+        self.concurrencia_max = concurrencia_max
+        self.espera_max = espera_max
+        self.latencia_objetivo = latencia_objetivo
+
+        self.cola = deque()         # (t_encolado, lectura, intentos, doc_id, aviso)
+        self.cond = threading.Condition()
+        self.lock_archivo = threading.Lock()
+        self.en_vuelo = 0
+        self.epoca = 0              # sube con cada bajada multiplicativa (una por ventana)
+        self.pausa = 0.0
+        self.no_antes_de = 0.0
+        self.cerrando = False
+        self.abortado = False       # venció el plazo de cerrar(): ya no se despacha ni se reencola
+        self.stats = {"enviados": 0, "commits": 0, "errores": 0, "throttling": 0, "descartados": 0}
+
+        self.pool = ThreadPoolExecutor(max_workers=concurrencia_max, thread_name_prefix="firestore")
+        self.hilo = threading.Thread(target=self.despachar, daemon=True)
+        self.hilo.start()
+
+    def agregar(self, lecturas, ids=None, al_confirmar=None):
+        """
+        Encola lecturas para Firestore. `ids` fija el ID de cada documento (si se repite, el
+        reintento sobrescribe en vez de duplicar). `al_confirmar(ok)` se llama una sola vez cuando
+        todas estas lecturas quedaron confirmadas (True) o alguna fue descartada (False).
+        """
+        ahora = time.monotonic()
+        ids = ids or [None] * len(lecturas)
+        aviso = {"pendientes": len(lecturas), "ok": True, "cb": al_confirmar} if al_confirmar else None
+        with self.cond:
+            if self.cerrando:
+                return False
+            self.cola.extend((ahora, item, 0, doc_id, aviso) for item, doc_id in zip(lecturas, ids))
+            self.cond.notify_all()
+        if aviso and not lecturas:
+            al_confirmar(True)
+        return True
+
+    def cerrar(self, timeout=None):
+        """
+        Envía lo pendiente (sin esperar a completar lote) y detiene el escritor. Devuelve True sólo
+        si todo quedó confirmado; si vence el plazo, lo encolado y lo que aún vuelva con error va a
+        `archivo_no_enviados`.
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            self.cerrando = True
+            self.cond.notify_all()
+            while self.cola or self.en_vuelo:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    break
+                self.cond.wait(restante)
+            limpio = not self.cola and not self.en_vuelo
+            self.abortado = not limpio
+            pendientes = list(self.cola)
+            self.cola.clear()
+            self.cond.notify_all()
+        self.hilo.join(1)
+        self.pool.shutdown(wait=False)
+        if pendientes:
+            self.descartar(pendientes, "cierre")
+        return limpio
+
+    def estadisticas(self):
+        with self.cond:
+            return dict(self.stats, pendientes=len(self.cola), en_vuelo=self.en_vuelo,
+                        tam_lote=self.tam_lote, concurrencia=self.concurrencia)
+
+    # --- DESPACHO ---
+    def lote_listo(self, ahora):
+        if not self.cola or self.en_vuelo >= self.concurrencia or ahora < self.no_antes_de:
+            return False
+        return (self.cerrando or len(self.cola) >= self.tam_lote
+                or ahora - self.cola[0][0] >= self.espera_max)
+
+    def despachar(self):
+        with self.cond:
+            while not self.abortado:
+                ahora = time.monotonic()
+                if self.lote_listo(ahora):
+                    n = min(self.tam_lote, LIMITE_LOTE, len(self.cola))
+                    lote = [self.cola.popleft() for _ in range(n)]
+                    self.en_vuelo += 1
+                    self.pool.submit(self.commit, lote, self.epoca)
+                    continue
+                if self.cerrando and not self.cola and not self.en_vuelo:
+                    self.cond.notify_all()
+                    return
+                # Con la concurrencia llena se espera sin plazo: commit() avisa al liberar un lugar.
+                # Si no, despertar cuando venza la espera del más antiguo o termine el backoff
+                espera = None
+                if self.cola and self.en_vuelo < self.concurrencia:
+                    espera = max(self.no_antes_de - ahora, self.cola[0][0] + self.espera_max - ahora, 0.01)
+                self.cond.wait(espera)
+
+    def reducir(self, epoca_lote):
+        """Bajada multiplicativa, como máximo una vez por ventana: los lotes despachados antes de la
+        última bajada ya reflejan la congestión que la provocó."""
+        if epoca_lote != self.epoca:
+            return
+        self.epoca += 1
+        self.tam_lote = max(1, self.tam_lote // 2)
+        self.concurrencia = max(1, self.concurrencia // 2)
+
+    def commit(self, lote, epoca_lote):
+        t0 = time.monotonic()
+        error = None
+        try:
+            batch = self.db.batch()
+            for _, item, _, doc_id, _ in lote:
+                batch.set(self.db.collection(self.coleccion).document(doc_id), item)
+            batch.commit()
+        except Exception as e:
+            error = e
+        latencia = time.monotonic() - t0
+
+        descartados = []
+        with self.cond:
+            self.en_vuelo -= 1
+            if error is None:
+                self.stats["commits"] += 1
+                self.stats["enviados"] += len(lote)
+                self.pausa = 0.0
+                if latencia <= self.latencia_objetivo:
+                    # Subida aditiva: lote más grande y un commit más en vuelo
+                    self.tam_lote = min(LIMITE_LOTE, self.tam_lote + PASO_LOTE)
+                    self.concurrencia = min(self.concurrencia_max, self.concurrencia + 1)
+                else:
+                    # Commit lento: lotes grandes son la causa habitual, se bajan lote y concurrencia
+                    self.reducir(epoca_lote)
+            else:
+                throttling = es_throttling(error)
+                self.stats["throttling" if throttling else "errores"] += 1
+                if epoca_lote == self.epoca:
+                    # Backoff exponencial antes del siguiente commit
+                    self.pausa = min(PAUSA_MAX, self.pausa * 2 or PAUSA_BASE)
+                    self.no_antes_de = time.monotonic() + self.pausa
+                self.reducir(epoca_lote)
+                # Se devuelven al frente de la cola para conservar el orden de llegada
+                for t, item, intentos, doc_id, aviso in reversed(lote):
+                    if self.abortado or not (throttling or intentos + 1 < MAX_REINTENTOS):
+                        descartados.append((t, item, intentos, doc_id, aviso))
+                    else:
+                        self.cola.appendleft((t, item, intentos if throttling else intentos + 1, doc_id, aviso))
+            self.cond.notify_all()
+
+        if error is None:
+            self.avisar(lote, True)
+        else:
+            self.log(f"❌ FALLO CONEXIÓN ({type(error).__name__}): lote de {len(lote)} "
+                     f"{'descartado' if self.abortado else 'reencolado'}, "
+                     f"lote={self.tam_lote} concurrencia={self.concurrencia}")
+        if descartados:
+            self.descartar(descartados[::-1], error)
+
+    def avisar(self, entradas, ok):
+        listos = []
+        with self.cond:
+            for _, _, _, _, aviso in entradas:
+                if aviso is None:
+                    continue
+                aviso["ok"] = aviso["ok"] and ok
+                aviso["pendientes"] -= 1
+                if aviso["pendientes"] == 0:
+                    listos.append(aviso)
+        for aviso in listos:
+            aviso["cb"](aviso["ok"])
+
+    def descartar(self, entradas, motivo):
+        lecturas = [item for _, item, _, _, _ in entradas]
+        with self.cond:
+            self.stats["descartados"] += len(lecturas)
+        self.log(f"⚠️ {len(lecturas)} registros no enviados ({motivo})")
+        if self.archivo_no_enviados:
+            try:
+                self.guardar_no_enviados(lecturas)
+            except Exception as e:
+                self.log(f"❌ ERROR ARCHIVO: {e}")
+        self.avisar(entradas, False)
+
+    def guardar_no_enviados(self, lecturas):
+        """
+        Agrega las lecturas al arreglo JSON de `archivo_no_enviados` sin releerlo: se reescribe sólo
+        el "]" final. Lo llaman a la vez los hilos del pool y cerrar(), por eso va bajo lock_archivo.
+        """
+        texto = ",\n".join(textwrap.indent(json.dumps(item, indent=4, ensure_ascii=False), "    ")
+                           for item in lecturas).encode('utf-8')
+        with self.lock_archivo:
+            if not os.path.exists(self.archivo_no_enviados) or not os.path.getsize(self.archivo_no_enviados):
+                with open(self.archivo_no_enviados, 'wb') as f:
+                    f.write(b"[\n" + texto + b"\n]")
+                return
+            with open(self.archivo_no_enviados, 'r+b') as f:
+                f.seek(0, os.SEEK_END)
+                fin = f.tell()
+                f.seek(max(0, fin - 64))
+                cola = f.read()
+                cierre = cola.rstrip().rfind(b"]")
+                if cierre < 0:
+                    raise ValueError(f"{self.archivo_no_enviados} no termina en un arreglo JSON")
+                vacio = cola[:cierre].rstrip().endswith(b"[")
+                f.seek(fin - len(cola) + cierre)
+                f.write((b"\n" if vacio else b",\n") + texto + b"\n]")
+                f.truncate()
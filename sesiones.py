@@ -0,0 +1,261 @@
+# *********************************************************************************************
+# Para proyecto NUBE VERDE                                                                    *
+# Descripción: Navegador de sesiones pasadas (simulacion_*.json, datos_enviados.json).        *
+# La primera vez que se abre una sesión se construye un índice binario "sidecar"              *
+# (<archivo>.idx) con el offset y largo en bytes (int64) de cada lectura: todas en orden del  *
+# archivo, y agrupadas por punto y por bloque horario. Al reabrir sólo se lee la cabecera; el sidecar se mapea con mmap y    *
+# de él se copian únicamente las secciones que pide el monitor o el filtro.                   *
+#                                                                                             *
+# Formato del sidecar:                                                                        *
+#   MAGIC (8 bytes) | tamaño, mtime_ns, total, largo_directorio (4 x int64)                   *
+#   directorio JSON {"todos": [pos, n], "puntos": {pid: [pos, n]}, "bloques": {b: [pos, n]}}  *
+#   secciones: pares int64 (offset, largo) en orden del archivo; `pos` es relativa al inicio  *
+#   de las secciones.                                                                         *
+# *********************************************************************************************
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+# --- CONFIGURACIÓN ---
+EXT_INDICE = '.idx'
+MAGIC = b"NVIDX3" + (b"<" if sys.byteorder == "little" else b">") + b"\0"
+CABECERA = struct.Struct("<qqqq")
+TAM_PAR = 16                # (offset, largo) como dos int64
+PATRONES_SESION = ['simulacion_*.json', 'datos_enviados.json']
+
+MESES_NUM = {"enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+             "agosto": 8, "septiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12}
+
+# Una lectura es un objeto plano; las cadenas se consumen enteras para que las llaves dentro
+# de un texto no corten el objeto. Se avanza de a un carácter por alternativa: en JSON válido
+# cada posición sólo admite una rama, así que no hay retroceso costoso
+RE_LECTURA = re.compile(rb'\{(?:[^{}"]|"(?:[^"\\]|\\.)*")*\}')
+RE_ID = re.compile(rb'"id_punto"\s*:\s*"((?:[^"\\]|\\.)*)"')
+RE_TIMESTAMP = re.compile(rb'"timestamp"\s*:\s*"(\d{4}-\d{2}-\d{2})T(\d{2})')
+RE_FECHA = re.compile(r'(\d+) de (\w+) de (\d+) a las (\d+):(\d+):(\d+) ([ap])\.m\.')
+RE_FECHA_CAMPO = re.compile(rb'"fecha"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def listar_sesiones(directorio='.'):
+    rutas = set()
+    for patron in PATRONES_SESION:
+        rutas.update(glob.glob(os.path.join(directorio, patron)))
+    return sorted(rutas, reverse=True)
+
+
+def bloque_de_fecha(fecha):
+    """Clave 'AAAA-MM-DD HH' a partir del texto 'fecha' (p. ej. '1 de febrero de 2026 a las ...')."""
+    m = RE_FECHA.search(fecha)
+    if not m:
+        return "sin_fecha"
+    dia, mes, anio, hora, _, _, ampm = m.groups()
+    hora = int(hora) % 12 + (12 if ampm == "p" else 0)
+    return datetime(int(anio), MESES_NUM[mes], int(dia), hora).strftime("%Y-%m-%d %H")
+
+
+def bloque_horario(lectura):
+    """Clave 'AAAA-MM-DD HH' de la lectura; usa 'timestamp' y si no existe interpreta 'fecha'."""
+    ts = lectura.get("timestamp")
+    if ts:
+        return ts[:13].replace("T", " ")
+    return bloque_de_fecha(lectura.get("fecha", ""))
+
+
+def ruta_indice(ruta):
+    return ruta + EXT_INDICE
+
+
+def construir_indice(ruta):
+    """
+    Recorre el arreglo JSON una sola vez y escribe el sidecar binario. De cada lectura sólo se
+    extraen 'id_punto' y la hora con expresiones regulares, sin decodificar el objeto completo.
+    """
+    stat = os.stat(ruta)
+    todos, puntos, bloques = array('q'), {}, {}
+    if stat.st_size:
+        with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in RE_LECTURA.finditer(mm):
+                ini, fin = m.span()
+                m_id = RE_ID.search(mm, ini, fin)
+                pid = m_id.group(1).decode('utf-8') if m_id else "?"
+                m_ts = RE_TIMESTAMP.search(mm, ini, fin)
+                if m_ts:
+                    bloque = f"{m_ts.group(1).decode()} {m_ts.group(2).decode()}"
+                else:
+                    m_fecha = RE_FECHA_CAMPO.search(mm, ini, fin)
+                    bloque = bloque_de_fecha(m_fecha.group(1).decode('utf-8')) if m_fecha else "sin_fecha"
+                par = (ini, fin - ini)
+                todos.extend(par)
+                puntos.setdefault(pid, array('q')).extend(par)
+                bloques.setdefault(bloque, array('q')).extend(par)
+    total = len(todos) // 2
+
+    directorio, pos = {"todos": [0, total], "puntos": {}, "bloques": {}}, len(todos) * 8
+    for tipo, secciones in (("puntos", puntos), ("bloques", bloques)):
+        for clave, pares in secciones.items():
+            directorio[tipo][clave] = [pos, len(pares) // 2]
+            pos += len(pares) * 8
+    dir_json = json.dumps(directorio, separators=(",", ":"), ensure_ascii=False).encode('utf-8')
+
+    # Se escribe a un temporal y se reemplaza de golpe: quien tenga mapeado el sidecar viejo no lo ve a medias
+    tmp = ruta_indice(ruta) + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(CABECERA.pack(stat.st_size, stat.st_mtime_ns, total, len(dir_json)))
+        f.write(dir_json)
+        todos.tofile(f)
+        for secciones in (puntos, bloques):
+            for pares in secciones.values():
+                pares.tofile(f)
+    os.replace(tmp, ruta_indice(ruta))
+
+
+def indice_vigente(ruta):
+    """True si el sidecar existe y corresponde al tamaño y mtime actuales del archivo."""
+    stat = os.stat(ruta)
+    try:
+        with open(ruta_indice(ruta), 'rb') as f:
+            cabecera = f.read(len(MAGIC) + CABECERA.size)
+    except OSError:
+        return False
+    if len(cabecera) < len(MAGIC) + CABECERA.size or not cabecera.startswith(MAGIC):
+        return False
+    tamano, mtime_ns, _, _ = CABECERA.unpack_from(cabecera, len(MAGIC))
+    return tamano == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+
+class OffsetsSidecar:
+    """Vista de sólo los offsets de una sección, para hacer bisect sin copiarla."""
+    def __init__(self, mm, base, n):
+        self.mm = mm
+        self.base = base
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return struct.unpack_from("q", self.mm, self.base + i * TAM_PAR)[0]
+
+
+class Sesion:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        if not indice_vigente(ruta):
+            construir_indice(ruta)
+        self.archivo_indice = open(ruta_indice(ruta), 'rb')
+        self.mm = mmap.mmap(self.archivo_indice.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, self.n_total, largo_dir = CABECERA.unpack_from(self.mm, len(MAGIC))
+        inicio_dir = len(MAGIC) + CABECERA.size
+        self.directorio = json.loads(self.mm[inicio_dir:inicio_dir + largo_dir])
+        self.inicio_secciones = inicio_dir + largo_dir
+
+    def cerrar(self):
+        self.mm.close()
+        self.archivo_indice.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @property
+    def nombre(self):
+        return os.path.basename(self.ruta)
+
+    def puntos(self):
+        return sorted(self.directorio["puntos"], key=lambda p: (len(p), p))
+
+    def bloques(self):
+        return sorted(self.directorio["bloques"])
+
+    # --- ACCESO AL SIDECAR ---
+    def ubicacion(self, tipo, clave=None):
+        """(pos, n) de la sección; "todos" es la única sin clave."""
+        if tipo == "todos":
+            return self.directorio["todos"]
+        return self.directorio[tipo].get(clave, (0, 0))
+
+    def seccion(self, tipo, clave=None, desde=0, hasta=None):
+        """Copia sólo los pares [desde, hasta) de la sección pedida como array('q') plano."""
+        pos, n = self.ubicacion(tipo, clave)
+        hasta = n if hasta is None else min(hasta, n)
+        desde = max(0, min(desde, hasta))
+        base = self.inicio_secciones + pos
+        pares = array('q')
+        pares.frombytes(self.mm[base + desde * TAM_PAR:base + hasta * TAM_PAR])
+        return pares
+
+    def cantidad(self, tipo, clave=None):
+        return self.ubicacion(tipo, clave)[1]
+
+    def buscar_offset(self, tipo, clave, offset, lado=bisect_left):
+        """Posición del primer par cuyo offset es >= (o > con bisect_right) `offset`, leyendo del mmap."""
+        pos, n = self.ubicacion(tipo, clave)
+        return lado(OffsetsSidecar(self.mm, self.inicio_secciones + pos, n), offset)
+
+    def interseccion(self, id_punto, bloque):
+        """Lecturas del punto dentro del bloque: sólo se copia el tramo del punto que cae en el bloque."""
+        del_bloque = self.seccion("bloques", bloque)
+        if not del_bloque:
+            return array('q')
+        desde = self.buscar_offset("puntos", id_punto, del_bloque[0])
+        hasta = self.buscar_offset("puntos", id_punto, del_bloque[-2], bisect_right)
+        en_bloque = set(del_bloque[0::2])
+        tramo = self.seccion("puntos", id_punto, desde, hasta)
+        resultado = array('q')
+        for ini, largo in zip(tramo[0::2], tramo[1::2]):
+            if ini in en_bloque:
+                resultado.extend((ini, largo))
+        return resultado
+
+    def total(self, id_punto=None, bloque=None):
+        if id_punto and bloque:
+            return len(self.interseccion(id_punto, bloque)) // 2
+        if id_punto:
+            return self.cantidad("puntos", id_punto)
+        if bloque:
+            return self.cantidad("bloques", bloque)
+        return self.n_total
+
+    def offsets(self, id_punto=None, bloque=None, ultimos=None):
+        """Pares (offset, largo) planos de las lecturas que cumplen el filtro, en orden del archivo."""
+        if id_punto and bloque:
+            pares = self.interseccion(id_punto, bloque)
+            return pares[len(pares) - 2 * ultimos:] if ultimos is not None and ultimos < len(pares) // 2 else pares
+        if id_punto:
+            tipo, clave = "puntos", id_punto
+        elif bloque:
+            tipo, clave = "bloques", bloque
+        else:
+            tipo, clave = "todos", None
+        n = self.cantidad(tipo, clave)
+        return self.seccion(tipo, clave, n - ultimos if ultimos is not None else 0)
+
+    def leer(self, id_punto=None, bloque=None, ultimos=None):
+        """
+        Lee sólo los fragmentos que cumplen el filtro; `ultimos` limita a las N últimas del archivo.
+        El archivo de datos se abre por lectura con seek (sin mmap): si otro proceso lo trunca,
+        la lectura corta termina la iteración en vez de tumbar el proceso.
+        """
+        offs = self.offsets(id_punto, bloque, ultimos)
+        if not offs:
+            return
+        with open(self.ruta, 'rb') as f:
+            for ini, largo in zip(offs[0::2], offs[1::2]):
+                f.seek(ini)
+                data = f.read(largo)
+                if len(data) < largo:
+                    return
+                try:
+                    yield json.loads(data)
+                except ValueError:
+                    return
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from datetime import datetime
+
+from distribuido import Coordinador, Trabajador, cerrar_conexion
+from escritor_adaptativo import EscritorAdaptativo
+
+PUNTOS = [f"N{i}" for i in range(1, 13)]
+INICIO = datetime(2026, 2, 1)
+
+
+class FakeEngine:
+    """Lo mínimo de SimulationEngine que usa el trabajador, sin Firebase."""
+
+    def __init__(self, db=None):
+        self.escritor = EscritorAdaptativo(db, "lecturas", lambda msg: None, espera_max=0.01) if db else None
+
+    def get_formatted_date(self, dt_obj):
+        return dt_obj.isoformat()
+
+    def cerrar_escritor(self, timeout=10):
+        if self.escritor:
+            self.escritor.cerrar(timeout)
+
+
+def lanzar(coord, nombre, tmp_path, destino="ARCHIVO", db=None):
+    trabajador = Trabajador(puerto=coord.puerto, nombre=nombre, destino=destino, engine=FakeEngine(db),
+                            directorio=str(tmp_path), intervalo_latido=0.05, log_callback=lambda msg: None)
+    hilo = threading.Thread(target=trabajador.ejecutar, daemon=True)
+    hilo.start()
+    return trabajador, hilo
+
+
+def esperar_progreso(coord, nombre, minimo=1, timeout=10):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        with coord.lock:
+            info = coord.trabajadores.get(nombre)
+            if info and info["puntos"] and min(info["puntos"].values()) >= minimo:
+                return
+        time.sleep(0.01)
+    raise AssertionError(f"{nombre} no reportó progreso")
+
+
+def matar(trabajador):
+    trabajador.stop_event.set()
+    cerrar_conexion(trabajador.sock)
+
+
+def ejecutar_con_caida(tmp_path, ticks, destino="ARCHIVO", db=None):
+    coord = Coordinador(puerto=0, semilla=42, puntos=PUNTOS, ticks=ticks, min_trabajadores=2,
+                        inicio=INICIO, timeout_latido=0.5, log_callback=lambda msg: None)
+    coord.iniciar()
+    t0, h0 = lanzar(coord, "T0", tmp_path, destino, db)
+    t1, h1 = lanzar(coord, "T1", tmp_path, destino, db)
+    esperar_progreso(coord, "T0")
+    matar(t0)
+    assert coord.esperar(30)
+    h0.join(10)
+    h1.join(10)
+    return coord
+
+
+def leer_archivos(tmp_path):
+    lecturas = []
+    for ruta in sorted(tmp_path.glob("simulacion_*.json")):
+        lecturas.extend(json.loads(ruta.read_text(encoding="utf-8")))
+    return lecturas
+
+
+def test_caida_de_trabajador_cubre_todo_y_es_determinista(tmp_path):
+    ticks = 1500
+    salidas = []
+    for corrida in ("a", "b"):
+        directorio = tmp_path / corrida
+        directorio.mkdir()
+        ejecutar_con_caida(directorio, ticks)
+        lecturas = leer_archivos(directorio)
+        unicas = {(l["id_punto"], l["timestamp"]): l for l in lecturas}
+        # Entrega al menos una vez: las repetidas son idénticas y no falta ningún (punto, tick)
+        assert len(unicas) == len(PUNTOS) * ticks
+        assert all(unicas[(l["id_punto"], l["timestamp"])] == l for l in lecturas)
+        salidas.append(sorted(unicas.items()))
+    assert salidas[0] == salidas[1]
+
+
+def test_caida_en_firestore_no_duplica_documentos(tmp_path, fake_db):
+    ticks = 1500
+    db = fake_db(latencia=0.001)
+    ejecutar_con_caida(tmp_path, ticks, destino="DB", db=db)
+    assert len(db.docs) == len(PUNTOS) * ticks
+    assert set(db.docs) == {f"42-{pid}-{t}" for pid in PUNTOS for t in range(ticks)}
+
+
+def test_trabajador_nuevo_recibe_puntos_y_reconexion_con_mismo_nombre(tmp_path):
+    ticks = 3000
+    coord = Coordinador(puerto=0, semilla=7, puntos=PUNTOS, ticks=ticks, min_trabajadores=1,
+                        inicio=INICIO, timeout_latido=0.5, log_callback=lambda msg: None)
+    coord.iniciar()
+    t0, h0 = lanzar(coord, "T0", tmp_path)
+    esperar_progreso(coord, "T0")
+
+    (tmp_path / "b").mkdir()
+    t1, h1 = lanzar(coord, "T1", tmp_path / "b")
+    esperar_progreso(coord, "T1")
+    with coord.lock:
+        assert len(coord.trabajadores["T1"]["puntos"]) == len(PUNTOS) // 2
+
+    # T1 vuelve a registrarse en el mismo directorio: la baja de su conexión vieja no debe borrar
+    # la nueva, y el archivo de la conexión vieja no se trunca
+    t1b, h1b = lanzar(coord, "T1", tmp_path / "b")
+    esperar_progreso(coord, "T1")
+    time.sleep(0.2)
+    with coord.lock:
+        assert "T1" in coord.trabajadores
+
+    # T0 se cae y se reinicia con el mismo nombre en el mismo directorio
+    matar(t0)
+    h0.join(10)
+    t0b, h0b = lanzar(coord, "T0", tmp_path)
+    esperar_progreso(coord, "T0")
+
+    assert coord.esperar(30)
+    for hilo in (h1, h1b, h0b):
+        hilo.join(10)
+    assert len(list((tmp_path / "b").glob("simulacion_*.json"))) == 2
+    assert len(list(tmp_path.glob("simulacion_*.json"))) == 2
+    lecturas = leer_archivos(tmp_path) + leer_archivos(tmp_path / "b")
+    assert len({(l["id_punto"], l["timestamp"]) for l in lecturas}) == len(PUNTOS) * ticks
+
+
+def test_trabajador_db_sin_firestore_no_se_registra(tmp_path):
+    coord = Coordinador(puerto=0, semilla=3, puntos=PUNTOS, ticks=100, min_trabajadores=1,
+                        inicio=INICIO, timeout_latido=0.5, log_callback=lambda msg: None)
+    coord.iniciar()
+    # engine.escritor es None, como cuando init_firestore falla
+    offline, h_offline = lanzar(coord, "T0", tmp_path, destino="DB")
+    h_offline.join(5)
+    assert not h_offline.is_alive() and offline.sock is None
+    t1, h1 = lanzar(coord, "T1", tmp_path)
+    assert coord.esperar(30)
+    h1.join(10)
+    assert len({(l["id_punto"], l["timestamp"]) for l in leer_archivos(tmp_path)}) == len(PUNTOS) * 100
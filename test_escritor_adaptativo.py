@@ -0,0 +1,117 @@
+import json
+import random
+import time
+
+from escritor_adaptativo import EscritorAdaptativo, LIMITE_LOTE
+
+
+def nuevo_escritor(db, **kwargs):
+    kwargs.setdefault("log_callback", lambda msg: None)
+    escritor = EscritorAdaptativo(db, "lecturas", **kwargs)
+    db.escritor = escritor
+    return escritor
+
+
+def test_entrega_exactamente_una_vez_con_throttling(fake_db):
+    rng = random.Random(7)
+    db = fake_db(falla=lambda n: rng.random() < 0.1)
+    escritor = nuevo_escritor(db, espera_max=0.05, latencia_objetivo=0.05)
+    confirmados = []
+    for tick in range(300):
+        lecturas = [{"id_punto": f"N{i}", "tick": tick} for i in range(1, 13)]
+        ids = [f"{l['id_punto']}-{tick}" for l in lecturas]
+        escritor.agregar(lecturas, ids, confirmados.append)
+
+    assert escritor.cerrar(30)
+    assert len(db.docs) == 300 * 12
+    assert db.escrituras == 300 * 12
+    assert confirmados == [True] * 300
+    assert max(db.tamanos) <= LIMITE_LOTE
+    assert max(db.tamanos) > 12          # se agruparon lecturas de varios ticks
+    assert escritor.estadisticas()["throttling"] > 0
+
+
+def test_lotes_mayores_al_limite_se_parten(fake_db):
+    db = fake_db(latencia=0)
+    escritor = nuevo_escritor(db, lote_inicial=LIMITE_LOTE, espera_max=0.01)
+    escritor.agregar([{"n": i} for i in range(1700)])
+    assert escritor.cerrar(10)
+    assert max(db.tamanos) == LIMITE_LOTE
+    assert sum(db.tamanos) == 1700
+
+
+def test_bajada_una_vez_por_ventana_y_recuperacion(fake_db):
+    # Los 8 primeros commits (todos en vuelo a la vez) fallan; después todo va rápido
+    db = fake_db(latencia=0.05, falla=lambda n: n < 8)
+    escritor = nuevo_escritor(db, lote_inicial=100, concurrencia_inicial=8, espera_max=0.01,
+                              latencia_objetivo=1.0)
+    escritor.agregar([{"n": i} for i in range(5000)])
+    assert escritor.cerrar(30)
+
+    despues = db.muestras[8:]
+    # Una sola bajada multiplicativa por los 8 fallos simultáneos, no ocho
+    assert min(t for t, _ in despues) == 50
+    assert min(c for _, c in despues) == 4
+    final = escritor.estadisticas()
+    assert final["tam_lote"] > 50 and final["concurrencia"] > 4
+    assert len(db.docs) == 5000
+
+
+def test_cerrar_con_plazo_vencido_descarta_sin_perder(tmp_path, fake_db):
+    archivo = tmp_path / "datos_no_enviados.json"
+    db = fake_db(latencia=1.0, falla=lambda n: True)
+    escritor = nuevo_escritor(db, espera_max=0.01, archivo_no_enviados=str(archivo))
+    confirmados = []
+    escritor.agregar([{"n": i} for i in range(10)], al_confirmar=confirmados.append)
+    time.sleep(0.1)
+
+    assert escritor.cerrar(0.2) is False
+    time.sleep(1.5)
+    stats = escritor.estadisticas()
+    assert stats["descartados"] == 10 and stats["en_vuelo"] == 0
+    assert not escritor.hilo.is_alive()
+    assert len(json.loads(archivo.read_text(encoding="utf-8"))) == 10
+    assert confirmados == [False]
+
+
+def test_descartes_concurrentes_no_pierden_registros(tmp_path, fake_db):
+    archivo = tmp_path / "datos_no_enviados.json"
+    archivo.write_text(json.dumps([{"previo": True}], indent=4), encoding="utf-8")
+    db = fake_db(latencia=0.2, falla=lambda n: True)
+    escritor = nuevo_escritor(db, lote_inicial=100, concurrencia_inicial=16, espera_max=0.01,
+                              archivo_no_enviados=str(archivo))
+    escritor.agregar([{"n": i} for i in range(20000)])
+    time.sleep(0.05)
+
+    assert escritor.cerrar(0.1) is False
+    time.sleep(0.5)
+    stats = escritor.estadisticas()
+    assert stats["descartados"] == 20000 and stats["en_vuelo"] == 0
+    guardados = json.loads(archivo.read_text(encoding="utf-8"))
+    assert guardados[0] == {"previo": True}
+    assert sorted(l["n"] for l in guardados[1:]) == list(range(20000))
+
+
+def test_commit_lento_baja_tamano_de_lote(fake_db):
+    db = fake_db(latencia=0.1)
+    escritor = nuevo_escritor(db, lote_inicial=100, concurrencia_inicial=2, espera_max=0.01,
+                              latencia_objetivo=0.05)
+    escritor.agregar([{"n": i} for i in range(300)])
+    assert escritor.cerrar(30)
+    # Los dos primeros commits (en vuelo a la vez) fueron lentos: una bajada de lote y concurrencia
+    assert db.muestras[:3] == [(100, 2), (100, 2), (50, 1)]
+    assert len(db.docs) == 300
+
+
+def test_despachador_no_sondea_con_concurrencia_llena(fake_db):
+    db = fake_db(latencia=0.5)
+    escritor = nuevo_escritor(db, lote_inicial=10, concurrencia_inicial=1, concurrencia_max=1,
+                              espera_max=0.01, latencia_objetivo=5.0)
+    esperas = []
+    wait = escritor.cond.wait
+    escritor.cond.wait = lambda timeout=None: esperas.append(timeout) or wait(timeout)
+    escritor.agregar([{"n": i} for i in range(30)])
+    time.sleep(0.4)
+    # Un solo commit en vuelo: el despachador duerme hasta que termine en vez de despertar cada 10 ms
+    assert len(esperas) <= 3
+    assert escritor.cerrar(10)
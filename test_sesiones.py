@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from sesiones import Sesion, bloque_horario, listar_sesiones, ruta_indice
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+ARCHIVOS = ["datos_enviados.json", "simulacion_20260201_004115.json", "simulacion_20260201_171844.json"]
+
+
+@pytest.fixture
+def sesiones(tmp_path):
+    for nombre in ARCHIVOS:
+        shutil.copy(os.path.join(REPO, nombre), tmp_path / nombre)
+    return tmp_path
+
+
+@pytest.mark.parametrize("nombre", ARCHIVOS)
+def test_filtros_desde_el_indice_igual_a_json_load(sesiones, nombre):
+    ruta = str(sesiones / nombre)
+    with open(ruta, encoding="utf-8") as f:
+        completo = json.load(f)
+    with Sesion(ruta) as sesion:
+        assert sesion.total() == len(completo)
+        assert list(sesion.leer()) == completo
+        assert list(sesion.leer(ultimos=5)) == completo[-5:]
+        for pid in sesion.puntos():
+            del_punto = [l for l in completo if l["id_punto"] == pid]
+            assert list(sesion.leer(id_punto=pid)) == del_punto
+            assert list(sesion.leer(id_punto=pid, ultimos=1)) == del_punto[-1:]
+        for bloque in sesion.bloques():
+            assert list(sesion.leer(bloque=bloque)) == [l for l in completo if bloque_horario(l) == bloque]
+            esperado = [l for l in completo if l["id_punto"] == "N3" and bloque_horario(l) == bloque]
+            assert list(sesion.leer(id_punto="N3", bloque=bloque)) == esperado
+            assert sesion.total("N3", bloque) == len(esperado)
+
+
+def test_sidecar_se_reusa_y_se_reconstruye_si_cambia(sesiones):
+    ruta = str(sesiones / "simulacion_20260201_004115.json")
+    Sesion(ruta).cerrar()
+    mtime_indice = os.stat(ruta_indice(ruta)).st_mtime_ns
+    Sesion(ruta).cerrar()
+    assert os.stat(ruta_indice(ruta)).st_mtime_ns == mtime_indice
+
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump([{"id_punto": "N1", "consumo_kwh": 1.0, "fecha": "", "timestamp": "2026-02-01T05:00:00"}], f)
+    with Sesion(ruta) as sesion:
+        assert sesion.total() == 1 and sesion.bloques() == ["2026-02-01 05"]
+    assert ruta_indice(ruta) not in listar_sesiones(str(sesiones))
+
+
+def test_archivo_truncado_mientras_esta_abierto(sesiones):
+    ruta = str(sesiones / "datos_enviados.json")
+    with Sesion(ruta) as sesion:
+        # Lo mismo que hace guardar_en_archivo al reescribir la sesión
+        open(ruta, "w").close()
+        assert list(sesion.leer()) == []
+
+
+def test_sin_filtro_respeta_el_orden_del_archivo(tmp_path):
+    # run_accelerated escribe horas futuras y run_process agrega después lecturas de la hora actual
+    lecturas = [{"id_punto": "N1", "consumo_kwh": 1.0, "fecha": "", "timestamp": ts}
+                for ts in ("2026-02-01T05:00:00", "2026-02-01T03:00:00", "2026-02-01T05:10:00")]
+    lecturas.append({"id_punto": "N2", "consumo_kwh": 2.0, "fecha": "sin formato"})
+    lecturas.append({"id_punto": "N1", "consumo_kwh": 3.0, "fecha": "", "timestamp": "2026-02-01T04:00:00"})
+    ruta = tmp_path / "simulacion_desordenada.json"
+    ruta.write_text(json.dumps(lecturas, indent=4), encoding="utf-8")
+    with Sesion(str(ruta)) as sesion:
+        assert list(sesion.leer()) == lecturas
+        assert list(sesion.leer(ultimos=2)) == lecturas[-2:]
+        assert list(sesion.leer(id_punto="N1", ultimos=2)) == [lecturas[2], lecturas[4]]